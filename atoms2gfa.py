@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import argparse
 import sys
+from array import array
+from collections import Counter
 
 def main():
     parser = argparse.ArgumentParser(
@@ -28,7 +30,7 @@ def main():
     # 1) Read excluded classes into a set
     excluded_classes = set()
     if args.exclude:
-        with open(args.exclude, 'r') as excl:
+        with open(args.exclude, 'rb') as excl:
             for line in excl:
                 cls = line.strip()
                 if cls:
@@ -38,175 +40,166 @@ def main():
     fachrom = {}
     faplas = {}
     sequences = read_fasta(args.fasta, fachrom, faplas)
+    # Slicing a memoryview does not copy, so segments are cut out of the
+    # FASTA without allocating an intermediate bytes object
+    sequences = {name: memoryview(seq) for name, seq in sequences.items()}
 
-    # 3) Read the atom definitions
-    segments = read_atoms(args.atoms)
+    # 3) Read the atom definitions as parallel columns
+    names, classes, strands, starts, ends = read_atoms(args.atoms)
 
     # 4) Count occurrences of each class (for cutoff filtering)
-    atomstats = {}
+    atomstats = Counter(classes)
     # Track if class appears in chromosome or plasmid
-    atchrom = {}
-    atplas = {}
-
-    for seg in segments:
-        cls = seg['class']
-        atomstats[cls] = atomstats.get(cls, 0) + 1
-        if cls not in atchrom:
-            atchrom[cls] = False
-        if cls not in atplas:
-            atplas[cls] = False
+    atchrom = dict.fromkeys(atomstats, False)
+    atplas = dict.fromkeys(atomstats, False)
 
+    for name, cls in zip(names, classes):
         # Mark whether the sequence for this segment is chromosome or plasmid
-        if fachrom.get(seg['name'], False):
+        if fachrom.get(name, False):
             atchrom[cls] = True
-        if faplas.get(seg['name'], False):
+        if faplas.get(name, False):
             atplas[cls] = True
 
     # 5) Build a histogram of how many classes appear X times
-    hist = []
-    for cls, count in atomstats.items():
-        while len(hist) <= count:
-            hist.append(0)
+    hist = [0] * (max(atomstats.values()) + 1) if atomstats else []
+    for count in atomstats.values():
         hist[count] += 1
 
     # Print histogram to stderr
     print("Histogram of atom counts per class:", file=sys.stderr)
     print(hist, file=sys.stderr)
 
-    # 6) We'll keep track of which classes we've actually output as segments
+    # 6) Classes that are skipped entirely:
+    # - the class is over the cutoff, or
+    # - the class is in the exclude list
+    skipped_classes = {cls for cls, count in atomstats.items() if count > args.cutoff}
+    skipped_classes |= excluded_classes
+
+    # We'll keep track of which classes we've actually output as segments
     used_classes = set()
 
     # For bridging: remember the last included atom *per sequence* 
     # so we can link from it to the next included atom on the same seq.
     last_included_per_seq = {}
 
-    # 7) Write GFA to file
-    with open(args.output, 'w') as gfa_file:
-        for atom in segments:
-            cls = atom['class']
-            seqname = atom['name']
-
-            # Skip if:
-            # - the class is over the cutoff, or
-            # - the class is in the exclude list
-            if atomstats[cls] > args.cutoff or cls in excluded_classes:
-                # We do NOT update last_included_per_seq[seqname].
-                continue
-
-            # This atom is "included" in the GFA, so we see if we need 
-            # to create an 'S' line for its class
-            if cls not in used_classes:
-                used_classes.add(cls)
-                subseq = sequences[seqname][atom['start']:atom['end']]
-                if atom['strand'] == '-':
-                    subseq = reverse_complement(subseq)
-
-                color_tags = ''
-                if atchrom[cls]:
-                    if atplas[cls]:
-                        color_tags = '\tCL:z:#aaaa00\tC2:z:#aaaa00'
-                    else:
-                        color_tags = '\tCL:z:#00aa00\tC2:z:#00aa00'
-                elif atplas[cls]:
-                    color_tags = '\tCL:z:#aa0000\tC2:z:#aa0000'
-
-                # Print the segment line: S <id> <sequence> [tags]
-                gfa_file.write(f"S\t{cls}\t{subseq}{color_tags}\n")
-
-            # If there was a previous included atom in the same seq, 
-            # link that atom to this atom
-            if seqname in last_included_per_seq:
-                prev_atom = last_included_per_seq[seqname]
-                # L <class1> <strand1> <class2> <strand2> 0M
-                gfa_file.write("\t".join([
-                    'L',
-                    prev_atom["class"], prev_atom['strand'],
-                    cls, atom['strand'],
-                    '0M'
-                ]) + "\n")
-
-            # Update the last included atom for this sequence
-            last_included_per_seq[seqname] = atom
+    # 7) Build the GFA in memory and write it with a single call
+    out = bytearray()
+    append = out.extend
+    for seqname, cls, strand, start, end in zip(names, classes, strands, starts, ends):
+        if cls in skipped_classes:
+            # We do NOT update last_included_per_seq[seqname].
+            continue
+
+        # This atom is "included" in the GFA, so we see if we need 
+        # to create an 'S' line for its class
+        if cls not in used_classes:
+            used_classes.add(cls)
+            subseq = sequences[seqname][start:end]
+            if strand == b'-':
+                subseq = reverse_complement(subseq)
+
+            color_tags = b''
+            if atchrom[cls]:
+                if atplas[cls]:
+                    color_tags = b'\tCL:z:#aaaa00\tC2:z:#aaaa00'
+                else:
+                    color_tags = b'\tCL:z:#00aa00\tC2:z:#00aa00'
+            elif atplas[cls]:
+                color_tags = b'\tCL:z:#aa0000\tC2:z:#aa0000'
+
+            # Segment line: S <id> <sequence> [tags]
+            append(b"S\t%s\t" % cls)
+            append(subseq)
+            append(color_tags)
+            append(b"\n")
+
+        # If there was a previous included atom in the same seq, 
+        # link that atom to this atom
+        if seqname in last_included_per_seq:
+            prev_cls, prev_strand = last_included_per_seq[seqname]
+            # L <class1> <strand1> <class2> <strand2> 0M
+            append(b"\t".join([
+                b'L',
+                prev_cls, prev_strand,
+                cls, strand,
+                b'0M\n'
+            ]))
+
+        # Update the last included atom for this sequence
+        last_included_per_seq[seqname] = (cls, strand)
+
+    with open(args.output, 'wb') as gfa_file:
+        gfa_file.write(out)
+
+
+# Translation table for reverse_complement: both cases map to the uppercase
+# complement and anything that is not A/C/G/T becomes 'N'.
+_RC_TABLE = bytes(
+    {'A': ord('T'), 'C': ord('G'), 'G': ord('C'), 'T': ord('A')}.get(chr(b).upper(), ord('N'))
+    for b in range(256)
+)
 
 
 def reverse_complement(seq):
-    """Return the reverse complement of a DNA sequence."""
-    complement = {'A': 'T', 'C': 'G', 'G': 'C', 'T': 'A', 'N': 'N'}
-    seq = seq.upper()
-    return ''.join(complement.get(base, 'N') for base in reversed(seq))
-
-
-def parse_atom_line(line):
-    """
-    Parse a single line from the atoms file.
-    Expected format: 
-      #name  atom_nr  class  strand  start  end
-      a1     1        1      +       0      129517
-    """
-    parts = line.split()
-    return {
-        'name': parts[0],
-        'class': parts[2],
-        'strand': parts[3],
-        'start': int(parts[4]),
-        'end': int(parts[5])
-    }
+    """Return the reverse complement of a DNA sequence (bytes or memoryview)."""
+    return bytes(seq).translate(_RC_TABLE)[::-1]
 
 
 def read_fasta(fasta_file, ischrom, isplas):
     """
-    Read sequences from a FASTA file into a dict: { seq_name: sequence_string }
+    Read sequences from a FASTA file into a dict: { seq_name: sequence }
+    (names and sequences are bytes).
     Also fill ischrom[name], isplas[name] with booleans based on the header line.
+
+    The whole file is read at once and carved into records with a single
+    split on '\n>', so there is no per-line Python work. Sequences are kept
+    as bytes.
     """
     sequences = {}
-    current_seq_lines = []
-    current_name = None
-
-    with open(fasta_file, 'r') as f:
-        for line in f:
-            if line.startswith('>'):
-                # Store the previous sequence
-                if current_name is not None:
-                    sequences[current_name] = ''.join(current_seq_lines)
-
-                current_seq_lines = []
-                # Parse the header
-                parts = line.split()
-                current_name = parts[0][1:]  # remove '>'
-
-                if 'chromosome=true' in line:
-                    ischrom[current_name] = True
-                else:
-                    ischrom[current_name] = False
-
-                if 'plasmid=true' in line:
-                    isplas[current_name] = True
-                else:
-                    isplas[current_name] = False
 
-            else:
-                current_seq_lines.append(line.strip())
-
-        # Last sequence
-        if current_name is not None:
-            sequences[current_name] = ''.join(current_seq_lines)
+    with open(fasta_file, 'rb') as f:
+        data = f.read()
+
+    records = data.split(b'\n>')
+    # Anything before the first '>' is not part of a record
+    if records[0].startswith(b'>'):
+        records[0] = records[0][1:]
+    else:
+        records.pop(0)
+
+    for rec in records:
+        header, _, body = rec.partition(b'\n')
+        fields = header.split(None, 1)
+        if not fields: continue
+        name = fields[0]
+        sequences[name] = body.translate(None, b' \t\r\n')
+        ischrom[name] = b'chromosome=true' in header
+        isplas[name] = b'plasmid=true' in header
 
     return sequences
 
 
 def read_atoms(atoms_file):
     """
-    Read lines from an atoms file, ignoring #comment lines.
-    Return a list of dicts (one per atom).
+    Read an atoms file in one go, ignoring #comment lines.
+    Expected format:
+      #name  atom_nr  class  strand  start  end
+      a1     1        1      +       0      129517
+
+    Return the atoms column-wise as five parallel sequences
+    (names, classes, strands, starts, ends); the text columns are lists of
+    bytes and the coordinates are compact int64 arrays.
     """
-    segments = []
-    with open(atoms_file, 'r') as f:
-        for line in f:
-            if line.startswith('#'):
-                continue
-            atom = parse_atom_line(line)
-            segments.append(atom)
-    return segments
+    with open(atoms_file, 'rb') as f:
+        data = f.read()
+    rows = [line.split() for line in data.splitlines() if line[:1] != b'#']
+
+    names = [parts[0] for parts in rows]
+    classes = [parts[2] for parts in rows]
+    strands = [parts[3] for parts in rows]
+    starts = array('q', [int(parts[4]) for parts in rows])
+    ends = array('q', [int(parts[5]) for parts in rows])
+    return names, classes, strands, starts, ends
 
 
 if __name__ == '__main__':
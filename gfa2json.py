@@ -4,15 +4,10 @@ import argparse
 import json
 from collections import defaultdict
 
-def extract_color(tags):
-    """
-    From a list of GFA tags (e.g. ["SR:Z:...", "CL:z:#ff00ff", ...]),
-    return the first CL:z: color code (e.g. "#ff00ff"), or None.
-    """
-    for tag in tags:
-        if tag.startswith("CL:z:"):
-            return tag.split("CL:z:")[1]
-    return None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def read_geese_for_usage(geese_file):
     """
@@ -23,10 +18,11 @@ def read_geese_for_usage(geese_file):
         for line in f:
             if line.startswith('#'):
                 continue
-            parts = line.rstrip("\n").split('\t')
+            # only the first six fields matter; leave the rest unsplit
+            parts = line.split('\t', 5)
             if len(parts) < 6:
                 continue
-            genome, _, atom, _, _, _ = parts[:6]
+            genome, atom = parts[0], parts[2]
             node_to_genomes[atom].add(genome)
     return node_to_genomes
 
@@ -35,27 +31,36 @@ def read_gfa(gfa_file):
     Read a GFA, returning:
       - node_set:    set of all segment IDs
       - edges:       list of {"source": id1, "target": id2}
-      - color_map:   dict id -> "#rrggbb" if found, else absent
+      - color_map:   dict id -> "#rrggbb" from the first CL:z: tag, if any
     """
     node_set = set()
     edges = []
     color_map = {}
     with open(gfa_file, 'r') as f:
         for line in f:
-            line = line.rstrip("\n")
-            if not line:
-                continue
-            parts = line.split('\t')
-            if line.startswith('S'):
+            rec = line[:1]
+            if rec == 'S':
                 # S <id> <sequence> [tags...]
-                seg = parts[1]
+                # Only the id and the tags are sliced out; the (possibly
+                # huge) sequence field is never copied or split.
+                i1 = line.find('\t')
+                i2 = line.find('\t', i1 + 1)
+                if i2 < 0:
+                    node_set.add(line[i1 + 1:].rstrip("\n"))
+                    continue
+                seg = line[i1 + 1:i2]
                 node_set.add(seg)
-                tags = parts[3:]
-                color = extract_color(tags)
-                if color:
-                    color_map[seg] = color
-            elif line.startswith('L'):
+                # first CL:z:<color> tag among the optional fields, if any
+                i3 = line.find('\t', i2 + 1)
+                p = line.find('\tCL:z:', i3) if i3 >= 0 else -1
+                if p >= 0:
+                    q = line.find('\t', p + 1)
+                    color = line[p + 6:q] if q >= 0 else line[p + 6:].rstrip("\n")
+                    if color:
+                        color_map[seg] = color
+            elif rec == 'L':
                 # L <src> <ori> <dst> <ori> <overlap> [tags...]
+                parts = line.rstrip("\n").split('\t', 4)
                 src, dst = parts[1], parts[3]
                 node_set.update([src, dst])
                 edges.append({"source": src, "target": dst})
@@ -88,8 +93,15 @@ def build_json(node_set, edges, node_to_genomes, color_map, out_json):
         nodes.append(node_obj)
 
     graph = {"nodes": nodes, "links": edges}
-    with open(out_json, 'w') as out:
-        json.dump(graph, out, indent=2)
+    # compact output: the file is only read by the D3 page, and skipping
+    # the pretty-printer is most of the serialisation cost
+    if orjson is not None:
+        with open(out_json, 'wb') as out:
+            out.write(orjson.dumps(graph))
+    else:
+        # raw UTF-8 like orjson, so both paths write the same bytes
+        with open(out_json, 'w', encoding='utf-8') as out:
+            json.dump(graph, out, separators=(',', ':'), ensure_ascii=False)
 
     print(f"Written {len(nodes)} nodes and {len(edges)} links to {out_json}")
 
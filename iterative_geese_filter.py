@@ -17,15 +17,18 @@ filter_geese.py
 """
 import argparse
 import logging
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import accumulate, islice
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 @dataclass
 class GfaSegment:
-    name: str
-    sequence: str
+    name: bytes
+    sequence: memoryview
     depth: int
     length: int
     duplicated: bool
@@ -33,60 +36,87 @@ class GfaSegment:
 
 # -- FASTA reading --------------------------------------------------------
 def read_fasta(fasta_file):
+    """
+    Read the whole FASTA at once and carve it into records with a single
+    split on '\n>'. Returns name -> sequence (both bytes).
+    """
     seqs = {}
-    with open(fasta_file) as f:
-        cur, buf = None, []
-        for line in f:
-            line = line.rstrip()
-            if not line: continue
-            if line.startswith('>'):
-                if cur: seqs[cur] = ''.join(buf)
-                cur = line[1:].split()[0]; buf = []
-            else:
-                buf.append(line)
-        if cur: seqs[cur] = ''.join(buf)
+    with open(fasta_file, 'rb') as f:
+        data = f.read()
+    records = data.split(b'\n>')
+    if records[0].startswith(b'>'):
+        records[0] = records[0][1:]
+    else:
+        records.pop(0)
+    for rec in records:
+        header, _, body = rec.partition(b'\n')
+        fields = header.split(None, 1)
+        if not fields: continue
+        seqs[fields[0]] = body.translate(None, b' \t\r\n')
     return seqs
 
 # -- GEESE parsing --------------------------------------------------------
 def parse_geese(geese_file):
     """
+    The file is read in one go and split into lines in C; all names,
+    strands and raw lines are kept as bytes.
+
     Returns:
       occ: atom -> list of (genome, start, end, strand)
       genome_order: genome -> list of (atom, strand)
+      atom_positions: atom -> list of (genome, index into genome_order[genome]),
+        genome-major (see index_positions)
+      atom_length: atom -> end - start of its first occurrence
       raw_lines: all lines for final rewriting
     """
     occ = defaultdict(list)
     genome_order = defaultdict(list)
-    raw_lines = []
-    with open(geese_file) as f:
-        for L in f:
-            raw_lines.append(L.rstrip('\n'))
-            if L.startswith('#'): continue
-            p = L.rstrip('\n').split('\t')
-            if len(p) < 6: continue
-            genome, _, atom, strand = p[0], p[1], p[2], p[3]
-            try:
-                start, end = int(p[4]), int(p[5])
-            except ValueError:
-                continue
-            occ[atom].append((genome, start, end, strand))
-            genome_order[genome].append((atom, strand))
-    return occ, genome_order, raw_lines
+    atom_length = {}
+    with open(geese_file, 'rb') as f:
+        raw_lines = f.read().splitlines()
+    for L in raw_lines:
+        if L[:1] == b'#': continue
+        p = L.split(b'\t')
+        if len(p) < 6: continue
+        genome, _, atom, strand = p[0], p[1], p[2], p[3]
+        try:
+            start, end = int(p[4]), int(p[5])
+        except ValueError:
+            continue
+        occ[atom].append((genome, start, end, strand))
+        if atom not in atom_length:
+            atom_length[atom] = end - start
+        genome_order[genome].append((atom, strand))
+    # Index genome by genome, not in file-line order: context ties are broken
+    # by insertion order, so the walk must not depend on how the .geese
+    # interleaves genomes
+    atom_positions = index_positions(genome_order)
+    return occ, genome_order, atom_positions, atom_length, raw_lines
+
+def index_positions(genome_order):
+    """
+    Rebuild atom -> list of (genome, idx) after genome_order has been filtered.
+    """
+    atom_positions = defaultdict(list)
+    for genome, order in genome_order.items():
+        for idx, (atom, _) in enumerate(order):
+            atom_positions[atom].append((genome, idx))
+    return atom_positions
 
 # -- Unique contexts ------------------------------------------------------
-def compute_unique_contexts(genome_order):
+def compute_unique_contexts(genome_order, atom_positions):
     """
     For each atom, collect all (prev, next) pairs and count
     how many 'unique' ones after ignoring repeats on either side.
     """
-    raw = defaultdict(set)
-    for order in genome_order.values():
-        for i,(atom,_) in enumerate(order):
+    uniq = {}
+    for atom, positions in atom_positions.items():
+        pairs = set()
+        for g,i in positions:
+            order = genome_order[g]
             prev_a = order[i-1][0] if i>0 else None
             next_a = order[i+1][0] if i<len(order)-1 else None
-            raw[atom].add((prev_a, next_a))
-    uniq = {}
-    for atom, pairs in raw.items():
+            pairs.add((prev_a, next_a))
         seen_p, seen_n = set(), set()
         cnt = 0
         for p,n in pairs:
@@ -97,15 +127,18 @@ def compute_unique_contexts(genome_order):
     return uniq
 
 # -- Build segment metadata ----------------------------------------------
+_REVCOMP_TBL = bytes.maketrans(b'ACGTNacgtn', b'TGCANtgcan')
+
 def revcomp(s):
-    return s.translate(str.maketrans('ACGTacgt','TGCAtgca'))[::-1]
+    return s.translate(_REVCOMP_TBL)[::-1]
 
 def build_segments(occ, seqs):
     """
     Build a GfaSegment per atom:
       • depth = total #occurrences
       • duplicated = does any genome contain >1?
-      • seq/length from first occurrence
+      • seq/length from first occurrence (a zero-copy view into the
+        FASTA for '+' hits)
     """
     segs = []
     for atom, hits in occ.items():
@@ -116,10 +149,10 @@ def build_segments(occ, seqs):
         dup = any(c>1 for c in by_genome.values())
         g0,s0,e0,st0 = hits[0]
         length = e0 - s0
-        seq = ""
+        seq = memoryview(b"")
         if g0 in seqs:
             frag = seqs[g0][s0:e0]
-            seq = revcomp(frag) if st0=='-' else frag
+            seq = memoryview(revcomp(bytes(frag))) if st0==b'-' else frag
         segs.append(GfaSegment(atom, seq, depth, length, dup, 0))
     return segs
 
@@ -139,16 +172,17 @@ def filter_atoms(segs, min_depth, max_length, remove_dup, max_unique):
 
 # -- Pair scoring w/ context tracking ------------------------------------
 def compute_in_out(genome_order):
+    """
+    IN[a] / OUT[a]: atoms seen directly before / after `a` (respecting
+    strand), built from each adjacent pair of every order.
+    """
     IN, OUT = defaultdict(set), defaultdict(set)
     for order in genome_order.values():
-        for i,(a,st) in enumerate(order):
-            # respect strand
-            if st == '-':
-                if i>0:  OUT[a].add(order[i-1][0])
-                if i<len(order)-1: IN[a].add(order[i+1][0])
-            else:
-                if i>0:  IN[a].add(order[i-1][0])
-                if i<len(order)-1: OUT[a].add(order[i+1][0])
+        for (x,sx),(y,sy) in zip(order, islice(order, 1, None)):
+            # y follows x: it's x's successor unless x is reversed, and x
+            # is y's predecessor unless y is reversed
+            (IN if sx == b'-' else OUT)[x].add(y)
+            (OUT if sy == b'-' else IN)[y].add(x)
     return IN, OUT
 
 def find_high_diverse_pairs_with_contexts(genome_order, atom_lengths,
@@ -165,72 +199,107 @@ def find_high_diverse_pairs_with_contexts(genome_order, atom_lengths,
     IN, OUT = compute_in_out(genome_order)
     contexts_map = defaultdict(lambda: defaultdict(set))
     for genome, order in genome_order.items():
-        n = len(order)
-        # prefix‐sum of lengths
-        ps = [0]*(n+1)
-        for i,(atom,_) in enumerate(order):
-            ps[i+1] = ps[i] + atom_lengths.get(atom,0)
-        for i,(a,st) in enumerate(order):
+        atoms = [atom for atom,_ in order]
+        n = len(atoms)
+        # prefix‐sum of lengths (non-decreasing, so spans can be bisected)
+        ps = list(accumulate((atom_lengths.get(atom,0) for atom in atoms), initial=0))
+        in_ok = [len(IN[b]) >= min_out for b in atoms]
+        for i,a in enumerate(atoms):
             if len(OUT[a]) < min_in: continue
-            for j in range(i+1, n):
-                b,_ = order[j]
-                if len(IN[b]) < min_out: continue
-                span = ps[j+1] - ps[i]
-                if span > max_span: break
-                between = tuple(order[k][0] for k in range(i+1, j))
-                contexts_map[(a,b)][between].add(genome)
+            # first j whose span ps[j+1]-ps[i] exceeds max_span
+            j_hi = bisect_right(ps, ps[i] + max_span, i+1) - 1
+            for j in range(i+1, min(j_hi, n)):
+                if not in_ok[j]: continue
+                between = tuple(atoms[i+1:j])
+                contexts_map[(a,atoms[j])][between].add(genome)
     return contexts_map
 
 # -- New: context‐based filtering ----------------------------------------
-def context_filter(contexts_map, genome_order):
+def resolve_atom_contexts(atoms, genome_order, atom_positions):
     """
-    For each (a,b) in contexts_map:
-      • union_atoms = all atoms appearing in any 'between' tuple
-      For each such atom:
-        1) Recompute atom_ctx2genomes from genome_order: for every occurrence
-           of `atom`, record its (prev,next) context (respecting strand) → set(genomes).
+    For each atom in `atoms`:
+        1) Look up atom_ctx2genomes: for every occurrence of `atom`, its
+           (prev,next) context (respecting strand) → set(genomes), read
+           directly from the atom's entries in atom_positions.
         2) Choose best_ctx = the context with the largest genome set.
         3) In *all* other contexts, for each genome in that genome‐set, mark atom for removal.
-    Finally apply all per-genome removals to genome_order in-place.
     Returns per_genome_rm: genome → set(atoms_to_remove).
     """
     per_genome_rm = defaultdict(set)
 
-    for (a, b), between_ctxs in contexts_map.items():
-        # union of all the 'between' atoms for this (a,b) pair
-        union_atoms = set(x for ctx in between_ctxs for x in ctx)
-
-        for atom in union_atoms:
-            # build that atom's true contexts across *all* genome_order
-            atom_ctx2gen = defaultdict(set)
-            for genome, order in genome_order.items():
-                for idx, (at, strand) in enumerate(order):
-                    if at != atom:
-                        continue
-                    prev_atom = order[idx-1][0] if idx > 0 else None
-                    next_atom = order[idx+1][0] if idx < len(order)-1 else None
-                    # respect strand
-                    if strand == '+':
-                        ctx = (prev_atom, next_atom)
-                    else:
-                        ctx = (next_atom, prev_atom)
-                    atom_ctx2gen[ctx].add(genome)
-
-            if not atom_ctx2gen:
+    for atom in atoms:
+        # build that atom's true contexts across *all* genome_order
+        ctx2gen = defaultdict(set)
+        for genome, idx in atom_positions.get(atom, ()):
+            order = genome_order[genome]
+            strand = order[idx][1]
+            prev_atom = order[idx-1][0] if idx > 0 else None
+            next_atom = order[idx+1][0] if idx < len(order)-1 else None
+            # respect strand
+            if strand == b'+':
+                ctx = (prev_atom, next_atom)
+            else:
+                ctx = (next_atom, prev_atom)
+            ctx2gen[ctx].add(genome)
+
+        if not ctx2gen:
+            continue
+
+        # pick the single best context (max number of genomes)
+        best_ctx, best_genomes = max(
+            ctx2gen.items(),
+            key=lambda item: len(item[1])
+        )
+
+        # remove `atom` from all *other* contexts' genomes
+        for ctx, genomes in ctx2gen.items():
+            if ctx == best_ctx:
                 continue
+            for g in genomes:
+                per_genome_rm[g].add(atom)
+
+    return per_genome_rm
+
+# worker-process state: set once per worker by the pool initializer so the
+# (large, read-only) orders and positions are not sent with every chunk
+_worker_orders = None
+
+def _init_context_worker(genome_order, atom_positions):
+    global _worker_orders
+    _worker_orders = (genome_order, atom_positions)
 
-            # pick the single best context (max number of genomes)
-            best_ctx, best_genomes = max(
-                atom_ctx2gen.items(),
-                key=lambda item: len(item[1])
-            )
+def _resolve_atom_contexts_chunk(atoms):
+    return resolve_atom_contexts(atoms, *_worker_orders)
 
-            # remove `atom` from all *other* contexts' genomes
-            for ctx, genomes in atom_ctx2gen.items():
-                if ctx == best_ctx:
-                    continue
-                for g in genomes:
-                    per_genome_rm[g].add(atom)
+def context_filter(contexts_map, genome_order, atom_positions, workers=1):
+    """
+    union_atoms = all atoms appearing in any 'between' tuple of any (a,b)
+    in contexts_map; each is resolved by resolve_atom_contexts. With
+    workers > 1 the atoms are sharded over a process pool and the per-genome
+    removals are unioned.
+    Finally apply all per-genome removals to genome_order in-place.
+    Returns per_genome_rm: genome → set(atoms_to_remove).
+    """
+    # union of all the 'between' atoms over every (a,b) pair; an atom's
+    # contexts don't depend on the pair, so each atom is resolved once
+    union_atoms = set()
+    for between_ctxs in contexts_map.values():
+        for ctx in between_ctxs:
+            union_atoms.update(ctx)
+
+    if workers > 1 and len(union_atoms) > 1:
+        atoms = list(union_atoms)
+        n_chunks = workers * 4
+        chunks = [atoms[i::n_chunks] for i in range(n_chunks)]
+        per_genome_rm = defaultdict(set)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_init_context_worker,
+                                 initargs=(genome_order, atom_positions)) as ex:
+            for part in ex.map(_resolve_atom_contexts_chunk, chunks):
+                for g, rm in part.items():
+                    per_genome_rm[g] |= rm
+    else:
+        per_genome_rm = resolve_atom_contexts(union_atoms, genome_order, atom_positions)
 
     # apply all per-genome removals
     for genome, lst in genome_order.items():
@@ -243,19 +312,28 @@ def context_filter(contexts_map, genome_order):
 
 # -- Final .geese rewrite -------------------------------------------------
 def rewrite_final_geese(raw_lines, global_rm, per_genome_rm, out_file):
-    with open(out_file, 'w') as f:
-        for L in raw_lines:
-            if L.startswith('#'):
-                f.write(L + "\n")
-                continue
-            p = L.split('\t')
-            if len(p) < 3:
-                f.write(L + "\n")
-                continue
-            genome, atom = p[0], p[2]
-            if atom in global_rm or atom in per_genome_rm.get(genome, set()):
-                continue
-            f.write(L + "\n")
+    out = []
+    keep = out.append
+    for L in raw_lines:
+        # comment/blank lines are copied through without any parsing
+        if not L or L[:1] == b'#':
+            keep(L + b"\n")
+            continue
+        # locate genome (field 0) and atom (field 2) without splitting
+        # the whole line
+        i1 = L.find(b'\t')
+        i2 = L.find(b'\t', i1 + 1)
+        if i2 < 0:
+            keep(L + b"\n")
+            continue
+        i3 = L.find(b'\t', i2 + 1)
+        genome = L[:i1]
+        atom = L[i2 + 1:i3] if i3 >= 0 else L[i2 + 1:]
+        if atom in global_rm or atom in per_genome_rm.get(genome, ()):
+            continue
+        keep(L + b"\n")
+    with open(out_file, 'wb') as f:
+        f.writelines(out)
 
 # -- main -----------------------------------------------------------------
 def main():
@@ -272,11 +350,12 @@ def main():
     p.add_argument("--pair-min-out",  type=int, default=3)
     p.add_argument("--pair-max-span", type=int, default=70000)
     p.add_argument("--iterations",   type=int, default=1, help="Repeat global filter this many times, recomputing depths/contexts")
+    p.add_argument("--workers",      type=int, default=1, help="Processes used for context-based filtering")
     args = p.parse_args()
 
  # 1) initial load
-    seqs = read_fasta(args.fasta)
-    occ, genome_order, raw = parse_geese(args.geese_in)
+    seqs = {name: memoryview(s) for name, s in read_fasta(args.fasta).items()}
+    occ, genome_order, atom_positions, atom_length, raw = parse_geese(args.geese_in)
 
     global_rm = set()
     per_genome_rm = {}
@@ -288,7 +367,7 @@ def main():
         #    (we only need occ → segs → unique_context; sequence coords not needed
         #     for repeated passes, so we reuse occ with dummy coords)
         segs = build_segments(occ, seqs)
-        uniq = compute_unique_contexts(genome_order)
+        uniq = compute_unique_contexts(genome_order, atom_positions)
         for s in segs:
             s.unique_context = uniq.get(s.name, 0)
 
@@ -311,22 +390,22 @@ def main():
         for g, lst in genome_order.items():
             genome_order[g] = [(a,st) for a,st in lst if a not in new_global_rm]
 
-        # rebuild a minimal occ for next round (coords unused)
+        # re-index positions and rebuild a minimal occ for next round
+        # (coords unused)
+        atom_positions = index_positions(genome_order)
         occ = defaultdict(list)
-        for g, lst in genome_order.items():
-            for a,st in lst:
-                occ[a].append((g,0,0,st))
+        for a, positions in atom_positions.items():
+            occ[a] = [(g,0,0,genome_order[g][i][1]) for g,i in positions]
 
     # 5) pair scoring & context-based removals (unchanged)
-    atom_lengths = {s.name: s.length for s in build_segments(parse_geese(args.geese_in)[0], seqs)
-                    if s.name not in global_rm}
-    
+    atom_lengths = {a: L for a, L in atom_length.items() if a not in global_rm}
+
     contexts_map = find_high_diverse_pairs_with_contexts(
         genome_order, atom_lengths,
         args.pair_min_in, args.pair_min_out, args.pair_max_span
     )
     logging.info(f"Found {len(contexts_map)} candidate pairs")
-    per_genome_rm = context_filter(contexts_map, genome_order)
+    per_genome_rm = context_filter(contexts_map, genome_order, atom_positions, args.workers)
     logging.info(f"Context-based removal: atoms removed in {sum(len(v) for v in per_genome_rm.values())} genomes")
 
     # 7) final write
@@ -3,65 +3,298 @@
 """Score two GFA graphs (original vs. filtered) with a composite Hairball Index.
 
 Usage:
-    python score_graphs.py original.gfa filtered.gfa
+    python score_graphs.py [--gpu] original.gfa filtered.gfa
+
+--gpu runs community detection (Louvain) through NetworkX's nx-cugraph backend.
 """
 
-import networkx as nx
+import mmap
+import os
+import random
 import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, shortest_path
+
+try:
+    import igraph
+except ImportError:                                      # optional C backend
+    igraph = None
+
+try:
+    import leidenalg
+except ImportError:                                      # optional, needs igraph
+    leidenalg = None
+
+# Giant components larger than this get a sampled average shortest path
+# (BFS from SP_SAMPLE_SOURCES random sources) instead of the exact value.
+SP_EXACT_MAX_NODES = 5000
+SP_SAMPLE_SOURCES = 200
+
+# BFS sources per csgraph.shortest_path call; bounds the distance block
+# to SP_BLOCK x n float64 instead of a dense n x n matrix
+SP_BLOCK = 256
+
+# NetworkX dispatch backend for community detection (e.g. "cugraph", set by
+# --gpu). When set, louvain_communities runs on it instead of igraph; path
+# lengths always use scipy's csgraph.
+NX_BACKEND = None
+
+# Bytes of the mapped GFA scanned for newlines per numpy pass
+SCAN_CHUNK = 1 << 26
+
+# Order of the six Hairball terms in score_batch's feature/weight vectors
+WEIGHT_KEYS = (
+    "w_e2n", "w_mod", "w_sp",
+    "w_nodes_removed", "w_edges_removed", "w_len_removed",
+)
+
+# Pull everything compute_score needs out of its dicts in one call each
+_get_weights = itemgetter(*WEIGHT_KEYS)
+_get_metrics = itemgetter("edges", "nodes", "edge_per_node", "avg_shortest_path", "modularity")
+_get_totals = itemgetter("orig_len", "filt_len")
 
 # ---------- Helpers ----------------------------------------------------------
 def load_gfa(path):
     """
-    Parse a GFA file and return a NetworkX undirected graph plus total segment length.
-    Nodes carry attribute 'length' (bp).
+    Parse a GFA file and return its undirected topology as a symmetric CSR
+    adjacency matrix plus the total segment length (bp).
+
+    Segment names are factorized into dense int ids (0..V-1, in order of
+    first appearance) while parsing and links are collected as two int64
+    columns, so no per-node or per-edge Python objects are kept (see
+    _build_csr). Only the topology is scored, so the names themselves are
+    not kept.
+
+    The file is memory-mapped and S/L records are located by byte offset
+    (see _record_spans), so lines are never copied: names stay bytes (they
+    are only used as dict keys) and sequences are never decoded or even
+    sliced out. A segment's length comes from its LN:i: tag when present,
+    otherwise from the byte span of the sequence field ('*' counts as 0).
     """
-    G = nx.Graph()
     total_len = 0
+    ids = {}
+    src = array("q")                                     # link endpoints (ids)
+    dst = array("q")
 
-    with open(path, "r") as fh:
-        for line in fh:
-            if line.startswith("S"):                         # Segment
-                parts = line.rstrip().split("\t")
-                name   = parts[1]
-                seq    = parts[2] if len(parts) > 2 else ""
-                seglen = len(seq) if seq not in ("", "*") else 0
-                G.add_node(name, length=seglen)
-                total_len += seglen
-            elif line.startswith("L"):                       # Link
-                parts = line.rstrip().split("\t")
-                u = parts[1]
-                v = parts[3]
-                G.add_edge(u, v)
-    return G, total_len
-
-
-def graph_metrics(G):
-    """
-    Compute basic topological metrics needed for scoring.
-    Returns dict with:
-        edges, nodes, edge_per_node, avg_shortest_path, modularity
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            mm = b""                                     # mmap cannot map 0 bytes
+        else:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    for start, stop in _record_spans(mm):
+        if mm[start] == 83:                              # Segment ('S')
+            end = stop
+            while end > start and mm[end - 1] in b" \t\r":
+                end -= 1
+            i1 = mm.find(b"\t", start + 2, end)          # name | sequence
+            if i1 < 0:
+                i1 = i2 = end
+            else:
+                i2 = mm.find(b"\t", i1 + 1, end)         # sequence | tags
+                if i2 < 0:
+                    i2 = end
+            ids.setdefault(mm[start + 2:i1], len(ids))
+            j = mm.find(b"\tLN:i:", i2, end)
+            if j >= 0:
+                k = mm.find(b"\t", j + 6, end)
+                total_len += int(mm[j + 6:k if k >= 0 else end])
+            elif i2 - i1 > 1 and not (i2 - i1 == 2 and mm[i1 + 1] == 42):   # 42 == '*'
+                total_len += i2 - i1 - 1
+        else:                                            # Link ('L')
+            parts = mm[start:stop].rstrip().split(b"\t", 4)
+            src.append(ids.setdefault(parts[1], len(ids)))
+            dst.append(ids.setdefault(parts[3], len(ids)))
+
+    return _build_csr(len(ids), np.frombuffer(src, dtype=np.int64),
+                      np.frombuffer(dst, dtype=np.int64)), total_len
+
+
+def _build_csr(n, src, dst):
     """
-    E = G.number_of_edges()
-    V = G.number_of_nodes()
-    edge_per_node = E / V if V else 0.0
+    Symmetric CSR adjacency (int32 indptr/indices) for n nodes from link
+    endpoint arrays. Repeated and reversed links collapse into one
+    undirected edge; a self-loop is stored once, on the diagonal.
+    """
+    lo = np.minimum(src, dst)
+    hi = np.maximum(src, dst)
+    lo, hi = np.divmod(np.unique(lo * n + hi), n)        # one entry per edge
+    off = lo != hi
+    rows = np.concatenate((lo, hi[off]))
+    cols = np.concatenate((hi, lo[off]))
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    indices = cols[order].astype(np.int32)
+    return csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
 
-    # average shortest path on largest component (avoid infinities)
-    if V > 1 and not nx.is_empty(G):
-        largest_cc = max(nx.connected_components(G), key=len)
-        sub = G.subgraph(largest_cc).copy()
-        try:
-            avg_sp = nx.average_shortest_path_length(sub) if sub.number_of_nodes() > 1 else 0.0
-        except Exception:
-            avg_sp = 0.0
+
+def _record_spans(mm):
+    """
+    Yield (start, end) byte offsets of the S and L lines in a mapped GFA
+    (end excludes the newline).
+
+    Newlines are found SCAN_CHUNK bytes at a time with one vectorized
+    compare, and the record type of every line in the chunk is checked at
+    once, so H/P/W and other lines never reach Python.
+    """
+    n = len(mm)
+    buf = np.frombuffer(mm, dtype=np.uint8)
+    try:
+        start = 0
+        while start < n:
+            ends = np.flatnonzero(buf[start:start + SCAN_CHUNK] == 0x0A)
+            if len(ends):
+                ends += start
+            else:                                        # line longer than a chunk, or last line
+                end = mm.find(b"\n", start + SCAN_CHUNK)
+                ends = np.array([end if end >= 0 else n])
+            starts = np.empty_like(ends)
+            starts[0] = start
+            starts[1:] = ends[:-1] + 1
+            first = buf[starts]
+            keep = (first == 83) | (first == 76)         # 'S', 'L'
+            yield from zip(starts[keep].tolist(), ends[keep].tolist())
+            start = int(ends[-1]) + 1
+    finally:
+        del buf                                          # release the export on mm
+
+
+def _edges(A):
+    """
+    (src, dst) int arrays with each undirected edge of A once (src <= dst).
+    """
+    rows = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+    keep = rows <= A.indices
+    return rows[keep], A.indices[keep]
+
+
+def _to_igraph(A):
+    """
+    Build an igraph.Graph with the same nodes and edges as A.
+    """
+    src, dst = _edges(A)
+    return igraph.Graph(n=A.shape[0], edges=np.column_stack((src, dst)).tolist())
+
+
+def _to_networkx(A):
+    """
+    Build a NetworkX graph from A (only used for --gpu and when igraph is
+    missing).
+    """
+    return nx.from_scipy_sparse_array(A)
+
+
+def _giant_component(A):
+    """
+    Return the CSR submatrix induced by the largest connected component of A.
+    """
+    _, labels = connected_components(A, directed=False)
+    giant = labels == np.bincount(labels).argmax()
+    return A[giant][:, giant]
+
+
+def _average_shortest_path(A):
+    """
+    Average shortest path length on the largest component (avoids infinities),
+    computed with scipy's csgraph BFS on every backend (nx-cugraph does not
+    implement average_shortest_path_length, so --gpu does not apply here).
+
+    Giants above SP_EXACT_MAX_NODES are estimated from BFS runs out of
+    SP_SAMPLE_SOURCES random (fixed-seed) sources; the relative error is
+    ~1/sqrt(SP_SAMPLE_SOURCES).
+    """
+    giant = _giant_component(A)
+    n = giant.shape[0]
+    if n < 2:
+        return 0.0
+    if n > SP_EXACT_MAX_NODES:
+        sources = np.random.default_rng(0).choice(n, size=SP_SAMPLE_SOURCES, replace=False)
     else:
-        avg_sp = 0.0
+        sources = np.arange(n)                           # all pairs, exact
+    total = 0.0
+    for i in range(0, len(sources), SP_BLOCK):
+        dist = shortest_path(giant, directed=False, unweighted=True,
+                             indices=sources[i:i + SP_BLOCK])
+        total += float(dist.sum())
+    return total / (len(sources) * (n - 1))
+
+
+def modularity_backend():
+    """
+    Name of the community algorithm _modularity uses with the installed
+    packages. Partitions (and so Q and the Hairball score) differ between
+    backends, so scores are only comparable when this matches.
+    """
+    if igraph is not None and NX_BACKEND is None:
+        return "leidenalg Leiden" if leidenalg is not None else "igraph multilevel (Louvain)"
+    return f"networkx louvain_communities (backend: {NX_BACKEND or 'networkx'})"
+
 
-    # greedy modularity (fast, deterministic)
-    if V >= 2:
-        communities = list(nx.community.greedy_modularity_communities(G))
-        Q = nx.community.modularity(G, communities)
+def _modularity(A):
+    """
+    Modularity of a Louvain/Leiden community partition (fixed seed).
+    The partition comes from leidenalg if available, then igraph's
+    multilevel (Louvain), then NetworkX's louvain_communities (always
+    NetworkX, on NX_BACKEND, when a dispatch backend is set); Q itself is
+    computed from the membership labels by _modularity_from_labels.
+    """
+    if igraph is not None and NX_BACKEND is None:
+        g = _to_igraph(A)
+        if leidenalg is not None:
+            part = leidenalg.find_partition(g, leidenalg.ModularityVertexPartition, seed=0)
+        else:
+            # igraph draws from Python's random module; reseed for reproducibility
+            igraph.set_random_number_generator(random.Random(0))
+            part = g.community_multilevel()
+        labels = np.asarray(part.membership, dtype=np.int64)
     else:
-        Q = 0.0
+        communities = nx.community.louvain_communities(_to_networkx(A), seed=0, backend=NX_BACKEND)
+        labels = np.empty(A.shape[0], dtype=np.int64)
+        for label, members in enumerate(communities):
+            labels[list(members)] = label
+    return _modularity_from_labels(A, labels)
+
+
+def _modularity_from_labels(A, labels):
+    """
+    Newman modularity of the partition given by an int label per node:
+        Q = intra/m - sum_c(deg_c^2) / (4 m^2)
+    with m undirected edges, intra the edges inside a community and deg_c
+    the summed degree of community c (a self-loop adds 2 to its node).
+    """
+    src, dst = _edges(A)
+    m = len(src)
+    deg = np.bincount(src, minlength=A.shape[0]) + np.bincount(dst, minlength=A.shape[0])
+    intra = np.count_nonzero(labels[src] == labels[dst])
+    comm_deg = np.bincount(labels, weights=deg)
+    return float(intra / m - (comm_deg ** 2).sum() / (4 * m * m))
+
+
+def graph_metrics(A, *, need_sp=True, need_mod=True):
+    """
+    Compute basic topological metrics needed for scoring from the symmetric
+    CSR adjacency returned by load_gfa.
+    Returns dict with:
+        edges, nodes, edge_per_node, avg_shortest_path, modularity
+    avg_shortest_path / modularity are None (not computed) when need_sp /
+    need_mod is false, e.g. because their weight in the score is 0.
+    """
+    V = A.shape[0]
+    E = int(A.nnz + np.count_nonzero(A.diagonal())) // 2   # self-loops stored once
+    edge_per_node = E / V if V else 0.0
+
+    avg_sp = Q = None
+    if need_sp:
+        avg_sp = _average_shortest_path(A) if V > 1 and E else 0.0
+    if need_mod:
+        Q = _modularity(A) if V >= 2 and E else 0.0
 
     return {
         "edges": E,
@@ -72,6 +305,93 @@ def graph_metrics(G):
     }
 
 
+# (abs path, mtime_ns, size, NX_BACKEND, need_sp, need_mod) -> (metrics, total_len),
+# oldest first; a plain dict so results computed in worker processes can be
+# stored back in the parent
+_metrics_cache = {}
+METRICS_CACHE_SIZE = 32
+
+
+def _metrics_key(path, need_sp, need_mod):
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size, NX_BACKEND, need_sp, need_mod)
+
+
+def _cache_get(key):
+    """Cached (metrics, total_len) for key, or None; a hit becomes newest."""
+    hit = _metrics_cache.pop(key, None)
+    if hit is not None:
+        _metrics_cache[key] = hit
+    return hit
+
+
+def _cache_put(key, value):
+    _metrics_cache[key] = value
+    while len(_metrics_cache) > METRICS_CACHE_SIZE:
+        del _metrics_cache[next(iter(_metrics_cache))]    # evict the oldest
+
+
+def _compute_gfa_metrics(path, need_sp, need_mod):
+    A, total_len = load_gfa(path)
+    return graph_metrics(A, need_sp=need_sp, need_mod=need_mod), total_len
+
+
+def gfa_metrics(path, *, need_sp=True, need_mod=True):
+    """
+    load_gfa + graph_metrics for one file, memoized on (path, mtime, size).
+
+    Only the small metrics dict and the total length are cached, never the
+    graph, so a sweep over weights that rescores the same files does not
+    redo the component / path / modularity work. Touching or rewriting the
+    file invalidates its entry.
+    """
+    return gfa_metrics_many([path], need_sp=need_sp, need_mod=need_mod)[0]
+
+
+def gfa_metrics_many(paths, *, need_sp=True, need_mod=True):
+    """
+    gfa_metrics for several files. Cache misses are computed in parallel
+    worker processes (one per file, none on a single-core machine) and
+    stored back in this process's cache.
+    """
+    keys = [_metrics_key(path, need_sp, need_mod) for path in paths]
+    results = {}
+    todo = {}                                            # key -> path, misses only
+    for key, path in zip(keys, paths):
+        hit = _cache_get(key)
+        if hit is not None:
+            results[key] = hit
+        else:
+            todo[key] = path
+
+    if len(todo) > 1 and (os.cpu_count() or 1) > 1:
+        # the graphs share nothing, so parse and measure them in parallel
+        with ProcessPoolExecutor(max_workers=len(todo)) as pool:
+            futures = {
+                key: pool.submit(_gfa_metrics_worker, path, NX_BACKEND, need_sp, need_mod)
+                for key, path in todo.items()
+            }
+            for key, future in futures.items():
+                results[key] = future.result()
+    else:
+        for key, path in todo.items():
+            results[key] = _compute_gfa_metrics(path, need_sp, need_mod)
+
+    for key in todo:
+        _cache_put(key, results[key])
+    return [(dict(results[key][0]), results[key][1]) for key in keys]
+
+
+def _gfa_metrics_worker(path, backend, need_sp, need_mod):
+    """
+    _compute_gfa_metrics in a worker process; NX_BACKEND is passed in because
+    module globals set by main are not inherited under the spawn start method.
+    """
+    global NX_BACKEND
+    NX_BACKEND = backend
+    return _compute_gfa_metrics(path, need_sp, need_mod)
+
+
 def compute_score(orig, filt, totals, weights):
     """
     Compute composite Hairball‑like score (lower is better).
@@ -79,36 +399,107 @@ def compute_score(orig, filt, totals, weights):
     weights: dict with keys
         w_e2n, w_mod, w_sp,
         w_nodes_removed, w_edges_removed, w_len_removed
+    Returns (HI, terms) where terms holds the unweighted inputs:
+        e2n, mod, sp_ratio, nodes_removed, edges_removed, len_removed
+    A metric that graph_metrics skipped (None) contributes a 0 term; it is a
+    ValueError if its weight is not 0.
     """
-    # terms computed on filtered graph
-    e2n_term  = filt["edge_per_node"]
-    mod_term  = 1.0 - filt["modularity"]
-    sp_ratio  = (
-        filt["avg_shortest_path"] / orig["avg_shortest_path"]
-        if orig["avg_shortest_path"] else 1.0
-    )
+    w_e2n, w_mod, w_sp, w_nodes, w_edges, w_len = _get_weights(weights)
+    o_edges, o_nodes, _, o_sp, _ = _get_metrics(orig)
+    f_edges, f_nodes, f_e2n, f_sp, f_mod = _get_metrics(filt)
+    orig_len, filt_len = _get_totals(totals)
+
+    if w_mod and f_mod is None:
+        raise ValueError("modularity was not computed (need_mod=False) but w_mod is not 0")
+    if w_sp and (f_sp is None or o_sp is None):
+        raise ValueError("avg_shortest_path was not computed (need_sp=False) but w_sp is not 0")
+
+    # terms computed on filtered graph; a skipped (None) metric contributes 0
+    e2n_term  = f_e2n
+    mod_term  = 1.0 - f_mod if f_mod is not None else 0.0
+    if f_sp is None or o_sp is None:
+        sp_ratio = 0.0
+    else:
+        sp_ratio = f_sp / o_sp if o_sp else 1.0
 
     # removal ratios
-    nodes_removed = (orig["nodes"] - filt["nodes"]) / orig["nodes"] if orig["nodes"] else 0.0
-    edges_removed = (orig["edges"] - filt["edges"]) / orig["edges"] if orig["edges"] else 0.0
-    len_removed   = (
-        (totals["orig_len"] - totals["filt_len"]) / totals["orig_len"]
-        if totals["orig_len"] else 0.0
-    )
+    nodes_removed = (o_nodes - f_nodes) / o_nodes if o_nodes else 0.0
+    edges_removed = (o_edges - f_edges) / o_edges if o_edges else 0.0
+    len_removed   = (orig_len - filt_len) / orig_len if orig_len else 0.0
 
     HI = (
-        weights["w_e2n"]            * e2n_term +
-        weights["w_mod"]            * mod_term +
-        weights["w_sp"]             * sp_ratio +
-        weights["w_nodes_removed"]  * nodes_removed +
-        weights["w_edges_removed"]  * edges_removed +
-        weights["w_len_removed"]    * len_removed
+        w_e2n   * e2n_term +
+        w_mod   * mod_term +
+        w_sp    * sp_ratio +
+        w_nodes * nodes_removed +
+        w_edges * edges_removed +
+        w_len   * len_removed
     )
-    return HI
+    terms = {
+        "e2n":           e2n_term,
+        "mod":           mod_term,
+        "sp_ratio":      sp_ratio,
+        "nodes_removed": nodes_removed,
+        "edges_removed": edges_removed,
+        "len_removed":   len_removed,
+    }
+    return HI, terms
+
+
+def score_features(orig, filts, orig_len, filt_lens):
+    """
+    Feature matrix for score_batch: one row per filtered graph.
+
+    orig: graph_metrics dict of the original graph, orig_len its total length
+    filts: graph_metrics dicts of N filtered graphs, filt_lens their lengths
+    Columns match compute_score's terms. All N rows are divided at once with
+    np.divide(..., where=base != 0), which gives compute_score's fallbacks for
+    a zero base (removal ratios 0, sp_ratio 1) without per-row branches.
+    Skipped (None) metrics give a 0 column entry, as in compute_score.
+    """
+    # None metrics (skipped by graph_metrics) become NaN here
+    f = np.array([_get_metrics(m) for m in filts], dtype=np.float64).reshape(-1, 5)
+    o_edges, o_nodes, _, o_sp, _ = _get_metrics(orig)
+
+    diffs = np.column_stack((
+        o_nodes - f[:, 1],
+        o_edges - f[:, 0],
+        orig_len - np.asarray(filt_lens, dtype=np.float64),
+    ))
+    bases = np.array([o_nodes, o_edges, orig_len], dtype=np.float64)
+    ratios = np.divide(diffs, bases, out=np.zeros_like(diffs), where=bases != 0)
+    if o_sp is None:
+        sp_ratio = np.zeros(len(f))
+    else:
+        sp_ratio = np.divide(f[:, 3], o_sp, out=np.ones(len(f)), where=o_sp != 0)
+        sp_ratio[np.isnan(f[:, 3])] = 0.0
+    mod_term = 1.0 - f[:, 4]
+    mod_term[np.isnan(mod_term)] = 0.0
+
+    return np.column_stack((f[:, 2], mod_term, sp_ratio, ratios))
+
+
+def score_batch(features, weights):
+    """
+    Hairball scores for many filtered graphs at once.
+
+    features: (N, 6) array, one row per graph (see score_features), columns
+        e2n, 1 - modularity, sp_ratio,
+        nodes_removed, edges_removed, len_removed
+    weights: dict as for compute_score, or a length-6 sequence in
+        WEIGHT_KEYS order
+    Returns a length-N float64 array.
+    """
+    if isinstance(weights, dict):
+        weights = _get_weights(weights)
+    return np.asarray(features, dtype=np.float64) @ np.asarray(weights, dtype=np.float64)
 
 
 # ---------- Main -------------------------------------------------------------
-def main(orig_gfa, filt_gfa):
+def main(orig_gfa, filt_gfa, gpu=False):
+    global NX_BACKEND
+    NX_BACKEND = "cugraph" if gpu else None             # reset on every call
+
     # default weights (can be tweaked)
     weights = {
         "w_e2n":            0.5,
@@ -119,17 +510,15 @@ def main(orig_gfa, filt_gfa):
         "w_len_removed":    0.05,
     }
 
-    G_orig, len_orig = load_gfa(orig_gfa)
-    G_filt, len_filt = load_gfa(filt_gfa)
-
-    m_orig = graph_metrics(G_orig)
-    m_filt = graph_metrics(G_filt)
+    # metrics whose weight is 0 are not computed at all
+    need_sp = weights["w_sp"] > 0
+    need_mod = weights["w_mod"] > 0
 
-    nodes_removed = (m_orig["nodes"] - m_filt["nodes"]) / m_orig["nodes"] if m_orig["nodes"] else 0.0
-    edges_removed = (m_orig["edges"] - m_filt["edges"]) / m_orig["edges"] if m_orig["edges"] else 0.0
-    len_removed   = (len_orig - len_filt) / len_orig if len_orig else 0.0
+    (m_orig, len_orig), (m_filt, len_filt) = gfa_metrics_many(
+        (orig_gfa, filt_gfa), need_sp=need_sp, need_mod=need_mod
+    )
 
-    HI = compute_score(
+    HI, terms = compute_score(
         m_orig,
         m_filt,
         {"orig_len": len_orig, "filt_len": len_filt},
@@ -149,18 +538,24 @@ def main(orig_gfa, filt_gfa):
 
     print("=== Differences ===")
     print(f"nodes_removed        : {m_orig['nodes'] - m_filt['nodes']} "
-          f"({nodes_removed*100:.2f}%)")
+          f"({terms['nodes_removed']*100:.2f}%)")
     print(f"edges_removed        : {m_orig['edges'] - m_filt['edges']} "
-          f"({edges_removed*100:.2f}%)")
+          f"({terms['edges_removed']*100:.2f}%)")
     print(f"length_removed(bp)   : {len_orig - len_filt} "
-          f"({len_removed*100:.2f}%)\n")
+          f"({terms['len_removed']*100:.2f}%)\n")
 
+    if need_mod:
+        print(f"modularity_backend   : {modularity_backend()}")
     print(f"Composite Hairball score (lower is better): {HI:.4f}")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python score_graphs.py original.gfa filtered.gfa")
+    args = sys.argv[1:]
+    gpu = "--gpu" in args
+    if gpu:
+        args.remove("--gpu")
+    if len(args) != 2:
+        print("Usage: python score_graphs.py [--gpu] original.gfa filtered.gfa")
         sys.exit(1)
-    main(sys.argv[1], sys.argv[2])
+    main(args[0], args[1], gpu=gpu)
 